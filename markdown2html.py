@@ -17,121 +17,190 @@ Usage:
 import sys
 import os
 import re
-import hashlib
+import functools
+from collections import namedtuple
+
+_Patterns = namedtuple('_Patterns', ['ol', 'ol_empty', 'inline', 'emphasis'])
+_C_STRIP = str.maketrans('', '', 'cC')
+
+
+@functools.lru_cache(maxsize=None)
+def _patterns():
+    """Compile the Md regexes on first use and reuse them afterwards."""
+    return _Patterns(
+        ol=re.compile(r'^\d+\.\s'),
+        ol_empty=re.compile(r'^\d+\.$'),
+        inline=re.compile(
+            r'\*\*(.*?)\*\*|__(.*?)__|\[\[(.*?)\]\]|\(\((.*?)\)\)'),
+        emphasis=re.compile(r'\*\*(.*?)\*\*|__(.*?)__'))
 
 
 def parse_heading(line):
     """Parse a line and return the corresponding HTML heading tag."""
-    level = 0
-    while line.startswith("#"):
-        level += 1
-        line = line[1:]
+    level = len(line) - len(line.lstrip("#"))
 
     if 1 <= level <= 6:
-        line = line.strip()
+        line = line[level:].strip()
         return f"<h{level}>{line}</h{level}>"
     return None
 
 
-def parse_list(lines, index, list_type):
-    """Parse lines starting from an index to generate an HTML list."""
-    html_lines = [f"<{list_type}>"]
-    while index < len(lines) and (lines[index].startswith(("- ", "* ")) or
-                                  re.match(r'^\d+\.\s', lines[index])):
-        if list_type == "ul" and lines[index].startswith("- "):
-            item = lines[index][2:].strip()
-            html_lines.append(f"<li>{process_text(item)}</li>")
-        elif list_type == "ol" and re.match(r'^\d+\.\s', lines[index]):
-            item = lines[index].split('.', 1)[1].strip()
-            html_lines.append(f"<li>{process_text(item)}</li>")
-        index += 1
-    html_lines.append(f"</{list_type}>")
-    return html_lines, index
+def _next_line(lines, pending):
+    """Return the pushed-back line if any, else the next line or None."""
+    if pending:
+        return pending.pop()
+    return next(lines, None)
 
 
-def parse_paragraphs(lines):
-    """Parse lines and convert them into HTML paragraphs with line breaks."""
-    html_lines = []
-    paragraph = []
+def parse_list(line, lines, pending, list_type):
+    """Consume stripped lines, starting with ``line``, to build an HTML list.
 
-    index = 0
-    while index < len(lines):
-        line = lines[index].strip()
-        if line:
-            if paragraph:
-                paragraph.append(line)
-            else:
-                paragraph = [line]
+    The first line that does not belong to the list is pushed back onto
+    ``pending`` for the caller.
+    """
+    ol_re = _patterns().ol
+    ol_empty_re = _patterns().ol_empty
+    html_lines = [f"<{list_type}>"]
+    while line is not None:
+        # Dispatch on the first character; check the rest only if it fits
+        char = line[:1]
+        if char == "-" and line[1:2] == " ":
+            if list_type == "ul":
+                item = line[2:].lstrip()
+                html_lines.append(f"<li>{process_text(item)}</li>")
+        elif char == "*" and line[1:2] == " ":
+            pass  # "* " items continue the list but are not rendered
+        elif char.isdigit() and ol_re.match(line):
+            if list_type == "ol":
+                item = line.split('.', 1)[1].lstrip()
+                html_lines.append(f"<li>{process_text(item)}</li>")
+        # "- " and "2. " lose their trailing space when stripped, so a
+        # bare marker of the list's own type is an empty item
+        elif list_type == "ul" and line == "-":
+            html_lines.append("<li></li>")
+        elif (list_type == "ol" and char.isdigit() and
+              ol_empty_re.match(line)):
+            html_lines.append("<li></li>")
         else:
-            if paragraph:
-                html_lines.append('<p>\n' + process_text
-                                  ('\n'.join(paragraph)) + '\n</p>')
-                paragraph = []
-        index += 1
+            pending.append(line)
+            break
+        line = _next_line(lines, pending)
+    html_lines.append(f"</{list_type}>")
+    return html_lines
 
-    if paragraph:
-        html_lines.append('<p>\n' + process_text
-                          ('\n'.join(paragraph)) + '\n</p>')
 
-    return html_lines, index
+def parse_paragraphs(line, lines, pending):
+    """Consume stripped lines, starting with ``line``, to build a paragraph.
+
+    The paragraph ends at the first blank line or at a line that starts a
+    valid heading or a list block; that line is pushed back onto
+    ``pending``. Lines such as "####### x" stay in the paragraph.
+    """
+    ol_re = _patterns().ol
+    paragraph = []
+    while line is not None:
+        char = line[:1]
+        if (not char or (char == "#" and parse_heading(line)) or
+                (char == "-" and line[1:2] == " ") or
+                (char.isdigit() and ol_re.match(line))):
+            pending.append(line)
+            break
+        paragraph.append(line)
+        line = _next_line(lines, pending)
+
+    html_lines = ['<p>', process_text('\n'.join(paragraph)), '</p>']
+    return html_lines
+
+
+@functools.lru_cache(maxsize=1024)
+def _md5_hex(text):
+    """Return the MD5 hex digest of a string, caching repeated payloads."""
+    import hashlib
+
+    return hashlib.md5(text.encode()).hexdigest()
+
+
+def _dispatch_emphasis(match):
+    """Return the HTML replacement for a bold or italic Md match."""
+    if match.lastindex == 1:
+        return f"<b>{_process_emphasis(match.group(1))}</b>"
+    return f"<em>{_process_emphasis(match.group(2))}</em>"
+
+
+def _process_emphasis(text):
+    """Replaces only Md bold & italic, as seen by a [[text]] payload."""
+    if '*' not in text and '_' not in text:
+        return text
+    return _patterns().emphasis.sub(_dispatch_emphasis, text)
+
+
+def _dispatch(match):
+    """Return the HTML replacement for a single inline Md match."""
+    group = match.lastindex
+    if group == 1:
+        # Replace **text** with <b>text</b>
+        return f"<b>{process_text(match.group(1))}</b>"
+    if group == 2:
+        # Replace __text__ with <em>text</em>
+        return f"<em>{process_text(match.group(2))}</em>"
+    if group == 3:
+        # Convert [[text]] to MD5 hash, after bold & italic as before
+        return _md5_hex(_process_emphasis(match.group(3)))
+    # Remove all 'c' characters from ((text))
+    return process_text(match.group(4)).translate(_C_STRIP)
 
 
 def process_text(text):
     """Replaces Md bold & italic with HTML tags & handle custom Md."""
-    # Replace **text** with <b>text</b>
-    text = re.sub(r'\*\*(.*?)\*\*', r'<b>\1</b>', text)
-    # Replace __text__ with <em>text</em>
-    text = re.sub(r'__(.*?)__', r'<em>\1</em>', text)
-    # Convert [[text]] to MD5 hash
-    text = re.sub(r'\[\[(.*?)\]\]',
-                  lambda m: hashlib.md5(m.group(1).encode()).hexdigest(),
-                  text)
-    # Remove all 'c' characters from ((text))
-    text = re.sub(r'\(\((.*?)\)\)',
-                  lambda m: m.group(1).replace('c', '').replace('C', ''),
-                  text)
-    return text
+    # Most lines carry no inline Md, so skip the regex when no delimiter
+    # character is present
+    if ('*' not in text and '_' not in text and
+            '[' not in text and '(' not in text):
+        return text
+    # Single leftmost-match pass: when spans of different kinds cross,
+    # e.g. "((a **b)) c**", the span opened first wins and the other
+    # delimiter stays literal
+    return _patterns().inline.sub(_dispatch, text)
 
 
 def convert_markdown_to_html(input_file, output_file):
     """Convert a Markdown file to an HTML file."""
-    with open(input_file, 'r') as md_file:
-        lines = md_file.readlines()
+    ol_re = _patterns().ol
+    parts = []
+    # Holds the line read ahead by a block parser, if any
+    pending = []
 
-    with open(output_file, 'w') as html_file:
-        index = 0
-        while index < len(lines):
-            line = lines[index].strip()
+    with open(input_file, 'r') as md_file:
+        lines = (line.strip() for line in md_file)
+        line = _next_line(lines, pending)
+        while line is not None:
+            char = line[:1]
 
-            if line.startswith("#"):
+            if char == "#":
                 html_line = parse_heading(line)
                 if html_line:
-                    html_file.write(html_line + '\n')
+                    parts.append(html_line + '\n')
 
-            elif line.startswith("- "):
-                list_lines, index = parse_list(lines, index, "ul")
-                html_file.write("\n".join(list_lines) + '\n')
-                continue  # Skip the increment as it's already handled
+            elif char == "-" and line[1:2] == " ":
+                list_lines = parse_list(line, lines, pending, "ul")
+                parts.append("\n".join(list_lines) + '\n')
 
-            elif re.match(r'^\d+\.\s', line):
-                list_lines, index = parse_list(lines, index, "ol")
-                html_file.write("\n".join(list_lines) + '\n')
-                continue  # Skip the increment as it's already handled
+            elif char.isdigit() and ol_re.match(line):
+                list_lines = parse_list(line, lines, pending, "ol")
+                parts.append("\n".join(list_lines) + '\n')
 
-            elif line == "":
-                index += 1
-                continue  # Skip empty lines in the main loop
+            elif char:  # Empty lines are skipped
+                paragraph_lines = parse_paragraphs(line, lines, pending)
+                parts.append("\n".join(paragraph_lines) + '\n')
 
-            else:
-                # Collect all remaining lines as paragraphs
-                paragraph_lines, index = parse_paragraphs(lines[index:])
-                html_file.write("\n".join(paragraph_lines) + '\n')
-                break  # End processing as paragraphs should be the last thing
+            line = _next_line(lines, pending)
 
-            index += 1
+    with open(output_file, 'w') as html_file:
+        html_file.write(''.join(parts))
 
 
-if __name__ == "__main__":
+def main():
+    """Validate the command-line arguments and run the conversion."""
     # Check for the correct number of arguments
     if len(sys.argv) < 3:
         print("Usage: ./markdown2html.py README.md README.html",
@@ -151,3 +220,7 @@ if __name__ == "__main__":
 
     # Exit silently with success
     sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()